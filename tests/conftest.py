@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from car_sequencing_color_problem import CarSequencingColorProblem
+
+
+class _Problem(CarSequencingColorProblem):
+    # Newer qubots releases declare this hook abstract; it is not used here.
+    def _get_default_metadata(self):
+        return None
+
+
+@pytest.fixture
+def make_problem():
+    return _Problem
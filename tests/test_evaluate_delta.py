@@ -0,0 +1,42 @@
+import glob
+import os
+import random
+
+import pytest
+
+INSTANCES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "instances", "*.in")))
+
+
+@pytest.mark.parametrize("instance_file", INSTANCES[::6], ids=os.path.basename)
+def test_swap_sequence_matches_full_evaluation(make_problem, instance_file):
+    rng = random.Random(0)
+    problem = make_problem(instance_file, cache_size=0)
+    solution = problem.random_solution()
+    obj = problem.evaluate_solution(solution)
+    state = None
+    for _ in range(100):
+        i = rng.randrange(problem.start_position, problem.nb_positions)
+        j = rng.randrange(problem.start_position, problem.nb_positions)
+        if rng.random() < 0.2 and i + 1 < problem.nb_positions:
+            # Neighbouring positions share a color pair and most windows.
+            j = i + 1
+        new_obj, move = problem.evaluate_delta(solution, obj, state, i, j)
+        candidate = list(solution)
+        candidate[i], candidate[j] = candidate[j], candidate[i]
+        assert new_obj == problem.evaluate_solution(candidate)
+        # Rejected moves are dropped without touching the state.
+        if rng.random() < 0.3:
+            if state is not None:
+                assert problem.evaluate_delta(solution, obj, state, j, i)[0] == new_obj
+            continue
+        state = problem.commit_delta(move)
+        solution, obj = candidate, new_obj
+
+
+def test_swap_in_fixed_prefix_is_penalized(make_problem):
+    problem = make_problem(INSTANCES[0])
+    assert problem.start_position > 0
+    solution = problem.random_solution()
+    obj, move = problem.evaluate_delta(solution, None, None, 0, problem.nb_positions - 1)
+    assert obj == 1e9 and move is None
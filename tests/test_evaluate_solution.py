@@ -0,0 +1,34 @@
+import glob
+import os
+
+import pytest
+
+INSTANCES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "instances", "*.in")))
+
+
+@pytest.mark.parametrize("instance_file", INSTANCES[::12], ids=os.path.basename)
+def test_upper_bound_pruning(make_problem, instance_file):
+    problem = make_problem(instance_file)
+    solution = problem.random_solution()
+    # A bound below the first component prunes: the partial value still exceeds it,
+    # and it is not cached, so a later unbounded call returns the full value.
+    pruned = problem.evaluate_solution(solution, upper_bound=0)
+    assert pruned > 0
+    full = problem.evaluate_solution(solution)
+    assert pruned <= full
+    # A bound the solution does not exceed returns the exact value.
+    problem = make_problem(instance_file)
+    assert problem.evaluate_solution(solution, upper_bound=full) == full
+    problem = make_problem(instance_file)
+    assert problem.evaluate_solution(solution, upper_bound=full - 1) > full - 1
+
+
+@pytest.mark.parametrize("instance_file", INSTANCES[::12], ids=os.path.basename)
+def test_lex_round_trip(make_problem, instance_file):
+    problem = make_problem(instance_file)
+    solution = problem.random_solution()
+    packed = 0
+    for value in problem.evaluate_solution_lex(solution):
+        packed = packed * 10000 + value
+    assert packed == problem.evaluate_solution(solution)